@@ -0,0 +1,192 @@
+"""Admission control: bounded concurrency lanes for bulk/integration routes.
+
+Interactive routes are not laned. Bulk and integration routes each get a
+lane with a concurrency limit and a bounded wait queue, so a backfill or an
+optimizer pull cannot take over the threadpool and the database pool.
+Requests beyond the queue are rejected with 429; requests that wait longer
+than the lane's queue timeout get 503. Both carry Retry-After: the lane's
+retry_after for 429, and at least the queue timeout for 503.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import threading
+from collections import deque
+from typing import Any, Callable
+
+from . import metrics
+
+
+class Rejected(Exception):
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class Lane:
+    def __init__(self, name: str, concurrency: int, queue_limit: int, queue_timeout: float, retry_after: int = 5):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_limit = queue_limit
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.active = 0
+        # Futures are created per waiter on the running loop, so the lane is not bound to one loop
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def timeout_retry_after(self) -> int:
+        # The lane stayed saturated for a whole queue timeout; do not invite an immediate retry
+        return max(self.retry_after, math.ceil(self.queue_timeout))
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            metrics.LANE_ACTIVE.inc(self.name)
+            return
+        if len(self._waiters) >= self.queue_limit:
+            metrics.ADMISSION_REJECTED.inc(self.name, "queue_full")
+            raise Rejected(429, f"Too many queued {self.name} requests", self.retry_after)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        metrics.LANE_QUEUED.inc(self.name)
+        try:
+            await asyncio.wait_for(fut, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            # A slot may have been handed over just as we gave up; pass it on
+            if fut.done() and not fut.cancelled():
+                self.release()
+            if isinstance(exc, asyncio.TimeoutError):
+                metrics.ADMISSION_REJECTED.inc(self.name, "queue_timeout")
+                raise Rejected(503, f"Timed out waiting for a {self.name} slot", self.timeout_retry_after) from None
+            raise
+        finally:
+            if fut in self._waiters:
+                self._waiters.remove(fut)
+            metrics.LANE_QUEUED.dec(self.name)
+
+    def release(self) -> None:
+        # Hand the slot directly to the oldest live waiter, keeping FIFO order
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self.active -= 1
+        metrics.LANE_ACTIVE.dec(self.name)
+
+
+def _lane_from_env(name: str, concurrency: int, queue_limit: int, queue_timeout: float, retry_after: int) -> Lane:
+    prefix = f"ADMISSION_{name.upper()}_"
+    return Lane(
+        name,
+        concurrency=int(os.getenv(prefix + "CONCURRENCY", concurrency)),
+        queue_limit=int(os.getenv(prefix + "QUEUE", queue_limit)),
+        queue_timeout=float(os.getenv(prefix + "TIMEOUT", queue_timeout)),
+        retry_after=int(os.getenv(prefix + "RETRY_AFTER", retry_after)),
+    )
+
+
+LANES: dict[str, Lane] = {
+    "ingest": _lane_from_env("ingest", concurrency=2, queue_limit=8, queue_timeout=30.0, retry_after=5),
+    "bulk": _lane_from_env("bulk", concurrency=2, queue_limit=8, queue_timeout=30.0, retry_after=5),
+    # Graph followers only wait on the single-flight leader, so more of them may be admitted
+    "graph": _lane_from_env("graph", concurrency=4, queue_limit=32, queue_timeout=60.0, retry_after=10),
+}
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware mapping route templates to lanes; unmapped routes pass straight through."""
+
+    def __init__(self, app, router, route_lanes: dict[tuple[str, str], str]):
+        self.app = app
+        self.router = router
+        self.route_lanes = route_lanes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = scope.get("route_template") or metrics.route_template(self.router.routes, scope)
+        lane_name = self.route_lanes.get((scope["method"], route))
+        if lane_name is None:
+            await self.app(scope, receive, send)
+            return
+
+        lane = LANES[lane_name]
+        try:
+            await lane.acquire()
+        except Rejected as exc:
+            await _send_rejection(send, exc)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            lane.release()
+
+
+async def _send_rejection(send, exc: Rejected) -> None:
+    body = json.dumps({"detail": exc.detail}).encode("utf-8")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": exc.status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"retry-after", str(exc.retry_after).encode("ascii")),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution (threadpool side)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
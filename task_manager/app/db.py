@@ -1,17 +1,79 @@
 from __future__ import annotations
 
 import os
+import threading
+import time
 from contextlib import contextmanager
 from typing import Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from . import metrics
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./task_manager.db")
 
+
+# Per-thread time spent opening new DBAPI connections during the current checkout
+_connect_timing = threading.local()
+
+
+class TimedQueuePool(QueuePool):
+    # Pool events fire after a connection is handed out, so the wait is timed
+    # around the public connect(); time spent opening a new connection is subtracted.
+    def connect(self):
+        _connect_timing.elapsed = 0.0
+        start = time.perf_counter()
+        conn = super().connect()
+        metrics.record_pool_wait(max(time.perf_counter() - start - _connect_timing.elapsed, 0.0))
+        return conn
+
+
+def instrument_engine(engine: Engine) -> Engine:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        metrics.record_statement(statement, time.perf_counter() - conn.info["query_start"].pop())
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+    @event.listens_for(engine, "do_connect")
+    def _do_connect(dialect, conn_rec, cargs, cparams):
+        _connect_timing.started = time.perf_counter()
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        started = getattr(_connect_timing, "started", None)
+        if started is not None:
+            _connect_timing.elapsed = getattr(_connect_timing, "elapsed", 0.0) + time.perf_counter() - started
+            _connect_timing.started = None
+
+    metrics.POOL_CHECKED_OUT.set_callback(lambda: getattr(engine.pool, "checkedout", lambda: 0)())
+    return engine
+
+
+def pool_args(url: str) -> dict:
+    # In-memory SQLite keeps its default pool; a QueuePool would give each connection its own empty database
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {"poolclass": TimedQueuePool}
+
+
 # For SQLite, need check_same_thread=False for multithreaded Uvicorn
 connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(DATABASE_URL, echo=False, future=True, connect_args=connect_args)
+engine = instrument_engine(
+    create_engine(DATABASE_URL, echo=False, future=True, connect_args=connect_args, **pool_args(DATABASE_URL))
+)
 
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
 
@@ -31,4 +93,4 @@ def session_scope() -> Generator:
 
 def get_db() -> Generator:
     with session_scope() as session:
-        yield session
\ No newline at end of file
+        yield session
@@ -2,24 +2,49 @@ from __future__ import annotations
 
 import uvicorn
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 
+from . import admission, metrics
 from .db import engine
 from .models import Base
 from .routers.tasks import router as tasks_router
 from .routers.relations import router as relations_router
 
 app = FastAPI(title="Task Management Service", version="0.1.0")
+# Last added runs first: metrics wrap admission so shed requests are still counted
+app.add_middleware(
+    admission.AdmissionMiddleware,
+    router=app.router,
+    route_lanes={
+        ("POST", "/api/v1/tasks/integrations/ingest"): "ingest",
+        ("POST", "/api/v1/tasks/batch"): "ingest",
+        ("POST", "/api/v1/tasks/bulk/update"): "bulk",
+        ("POST", "/api/v1/tasks/bulk/delete"): "bulk",
+        ("GET", "/api/v1/tasks/integrations/graph"): "graph",
+    },
+)
+app.add_middleware(metrics.MetricsMiddleware, router=app.router)
 
 
 @app.on_event("startup")
 def on_startup():
     # Create tables if not exist. In production, prefer Alembic migrations.
     Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist, so indexes added later (e.g. ix_tasks_status_due_at)
+    # would never reach existing databases
+    for table in Base.metadata.sorted_tables:
+        for idx in table.indexes:
+            idx.create(bind=engine, checkfirst=True)
 
 
 app.include_router(tasks_router, prefix="/api/v1")
 app.include_router(relations_router, prefix="/api/v1")
 
 
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
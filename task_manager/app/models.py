@@ -10,6 +10,7 @@ from sqlalchemy import (
     Enum,
     Text,
     ForeignKey,
+    Index,
     String,
     Table,
     UniqueConstraint,
@@ -110,6 +111,11 @@ class Task(Base):
         lazy="selectin",
     )
 
+    __table_args__ = (
+        # Overdue/upcoming and calendar queries: equality on status, range on due_at
+        Index("ix_tasks_status_due_at", "status", "due_at"),
+    )
+
 
 class TaskDependency(Base):
     __tablename__ = "task_dependencies"
@@ -1,26 +1,48 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import and_, func, or_, select
+from sqlalchemy import Column, MetaData, String, Table, and_, delete, func, insert, or_, select, update
 from sqlalchemy.orm import Session, joinedload
 
+from ..admission import SingleFlight
 from ..db import get_db
-from ..models import Label, Task
+from ..models import Label, StatusEnum, Task, TaskDependency, TaskLabel
 from ..schemas import (
     BatchCreateRequest,
+    BulkDeleteRequest,
+    BulkMutationResult,
+    BulkUpdateRequest,
     GraphEdge,
     GraphNode,
     GraphResponse,
     TaskCreate,
+    TaskFilter,
     TaskOut,
     TaskQueryParams,
     TaskUpdate,
+    TimelineBucket,
+    TimelineResponse,
 )
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+_graph_flight = SingleFlight()
+
+# Per-connection scratch table holding the ids matched by a bulk mutation, so
+# every statement of the mutation sees the same set even when it changes
+# columns or label links the filter refers to. PostgreSQL drops it with the
+# transaction, whether it commits or rolls back.
+_bulk_ids = Table(
+    "bulk_task_ids",
+    MetaData(),
+    Column("id", String(36), primary_key=True),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
 
 def _get_or_create_labels(session: Session, label_names: list[str]) -> list[Label]:
     if not label_names:
@@ -42,6 +64,52 @@ def _get_or_create_labels(session: Session, label_names: list[str]) -> list[Labe
     return result
 
 
+def _task_filters(
+    q=None,
+    status=None,
+    priority=None,
+    label=None,
+    channel=None,
+    subcategory=None,
+    assigned_to_user_id=None,
+    created_by_user_id=None,
+    due_before=None,
+    due_after=None,
+) -> list:
+    filters = []
+    if q:
+        like = f"%{q}%"
+        filters.append(or_(Task.title.ilike(like), Task.description.ilike(like)))
+    if status:
+        filters.append(Task.status == status)
+    if priority:
+        filters.append(Task.priority == priority)
+    if channel:
+        filters.append(Task.channel == channel)
+    if subcategory:
+        filters.append(Task.subcategory == subcategory)
+    if assigned_to_user_id:
+        filters.append(Task.assigned_to_user_id == assigned_to_user_id)
+    if created_by_user_id:
+        filters.append(Task.created_by_user_id == created_by_user_id)
+    if due_before:
+        filters.append(Task.due_at != None)
+        filters.append(Task.due_at <= due_before)  # type: ignore
+    if due_after:
+        filters.append(Task.due_at != None)
+        filters.append(Task.due_at >= due_after)  # type: ignore
+    if label:
+        # semi-join via association so the filter also works in UPDATE/DELETE
+        filters.append(
+            Task.id.in_(
+                select(TaskLabel.c.task_id)
+                .join(Label, Label.id == TaskLabel.c.label_id)
+                .where(Label.name == label)
+            )
+        )
+    return filters
+
+
 @router.post("", response_model=TaskOut)
 def create_task(payload: TaskCreate, db: Session = Depends(get_db)):
     task = Task(
@@ -108,41 +176,21 @@ def list_tasks(
 ):
     stmt = select(Task).options(joinedload(Task.labels))
 
-    filters = []
-    if q:
-        like = f"%{q}%"
-        filters.append(or_(Task.title.ilike(like), Task.description.ilike(like)))
-    if status:
-        filters.append(Task.status == status)
-    if priority:
-        filters.append(Task.priority == priority)
-    if channel:
-        filters.append(Task.channel == channel)
-    if subcategory:
-        filters.append(Task.subcategory == subcategory)
-    if assigned_to_user_id:
-        filters.append(Task.assigned_to_user_id == assigned_to_user_id)
-    if created_by_user_id:
-        filters.append(Task.created_by_user_id == created_by_user_id)
-    if due_before:
-        filters.append(Task.due_at != None)
-        filters.append(Task.due_at <= due_before)  # type: ignore
-    if due_after:
-        filters.append(Task.due_at != None)
-        filters.append(Task.due_at >= due_after)  # type: ignore
-
+    filters = _task_filters(
+        q=q,
+        status=status,
+        priority=priority,
+        label=label,
+        channel=channel,
+        subcategory=subcategory,
+        assigned_to_user_id=assigned_to_user_id,
+        created_by_user_id=created_by_user_id,
+        due_before=due_before,
+        due_after=due_after,
+    )
     if filters:
         stmt = stmt.where(and_(*filters))
 
-    if label:
-        # join via association
-        from ..models import TaskLabel, Label as LabelModel
-        stmt = (
-            stmt.join(TaskLabel, Task.id == TaskLabel.c.task_id)
-            .join(LabelModel, LabelModel.id == TaskLabel.c.label_id)
-            .where(LabelModel.name == label)
-        )
-
     # Sorting
     sort_column = {
         "created_at": Task.created_at,
@@ -163,6 +211,209 @@ def list_tasks(
     return results
 
 
+def _due_bucket(dialect: str, granularity: str):
+    if dialect == "postgresql":
+        return func.date_trunc(granularity, Task.due_at)
+    # SQLite: weeks start on Monday, matching date_trunc('week')
+    if granularity == "week":
+        return func.date(Task.due_at, "-6 days", "weekday 1")
+    if granularity == "month":
+        return func.strftime("%Y-%m-01", Task.due_at)
+    return func.date(Task.due_at)
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _bucket_start(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+@router.get("/timeline", response_model=TimelineResponse)
+def timeline(
+    start: datetime,
+    end: datetime,
+    granularity: str = Query(default="day", pattern="^(day|week|month)$"),
+    counts_only: bool = Query(default=False),
+    open_only: bool = Query(
+        default=False, description="Only todo/in_progress tasks (overdue/upcoming views); combined with status by AND"
+    ),
+    per_bucket: int = Query(default=50, ge=1, le=500),
+    bucket_offset: int = Query(default=0, ge=0),
+    q: str | None = None,
+    status: str | None = Query(default=None),
+    priority: str | None = Query(default=None),
+    label: str | None = Query(default=None),
+    channel: str | None = Query(default=None),
+    subcategory: str | None = Query(default=None),
+    assigned_to_user_id: str | None = Query(default=None),
+    created_by_user_id: str | None = Query(default=None),
+    db: Session = Depends(get_db),
+):
+    # Mixed naive/aware bounds are valid input; naive values are taken as UTC
+    start, end = _as_utc(start), _as_utc(end)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    filters = _task_filters(
+        q=q,
+        status=status,
+        priority=priority,
+        label=label,
+        channel=channel,
+        subcategory=subcategory,
+        assigned_to_user_id=assigned_to_user_id,
+        created_by_user_id=created_by_user_id,
+    )
+    if open_only:
+        # ANDed with `status`, so open_only=true&status=done matches nothing
+        filters.append(Task.status.in_([StatusEnum.todo, StatusEnum.in_progress]))
+    # Half-open range on due_at so adjacent windows never double count
+    filters.append(Task.due_at >= start)
+    filters.append(Task.due_at < end)
+
+    bucket = _due_bucket(db.get_bind().dialect.name, granularity).label("bucket")
+    counts = db.execute(
+        select(bucket, func.count()).where(and_(*filters)).group_by(bucket).order_by(bucket)
+    ).all()
+
+    buckets = {key: TimelineBucket(start=_bucket_start(key), count=n) for key, n in counts}
+
+    if not counts_only and buckets:
+        rn = func.row_number().over(partition_by=bucket, order_by=(Task.due_at, Task.id)).label("rn")
+        ranked = select(Task.id, bucket, rn).where(and_(*filters)).subquery()
+        rows = db.execute(
+            select(ranked.c.bucket, ranked.c.id)
+            .where(ranked.c.rn > bucket_offset, ranked.c.rn <= bucket_offset + per_bucket)
+            .order_by(ranked.c.bucket, ranked.c.rn)
+        ).all()
+        for key, task_id in rows:
+            buckets[key].task_ids.append(task_id)
+
+    return TimelineResponse(
+        granularity=granularity,
+        start=start,
+        end=end,
+        total=sum(b.count for b in buckets.values()),
+        buckets=list(buckets.values()),
+    )
+
+
+def _bulk_filters(selector: TaskFilter, ids: list[str] | None) -> list:
+    filters = _task_filters(**selector.model_dump())
+    if ids is not None:
+        filters.append(Task.id.in_(ids))
+    if not filters:
+        raise HTTPException(status_code=400, detail="Bulk operations require a filter or ids")
+    return filters
+
+
+def _count_matches(db: Session, filters: list) -> int:
+    return db.scalar(select(func.count()).select_from(Task).where(and_(*filters))) or 0
+
+
+def _stage_matches(db: Session, filters: list) -> int:
+    conn = db.connection()
+    _bulk_ids.create(conn, checkfirst=True)
+    conn.execute(delete(_bulk_ids))
+    return conn.execute(insert(_bulk_ids).from_select(["id"], select(Task.id).where(and_(*filters)))).rowcount
+
+
+def _drop_stage(db: Session) -> None:
+    # Only called on success: after a failed statement PostgreSQL rejects the DROP and would mask
+    # the original error. Elsewhere a leftover table is harmless, _stage_matches clears it first.
+    conn = db.connection()
+    if conn.dialect.name != "postgresql":
+        _bulk_ids.drop(conn, checkfirst=True)
+
+
+@router.post("/bulk/update", response_model=BulkMutationResult)
+def bulk_update_tasks(payload: BulkUpdateRequest, db: Session = Depends(get_db)):
+    filters = _bulk_filters(payload.filter, payload.ids)
+    if payload.dry_run:
+        return BulkMutationResult(matched=_count_matches(db, filters), dry_run=True)
+
+    data = payload.changes.model_dump(exclude_unset=True)
+    labels = data.pop("labels", None)
+
+    if labels is None:
+        if not data:
+            return BulkMutationResult(matched=_count_matches(db, filters), dry_run=False)
+        result = db.execute(
+            update(Task).where(and_(*filters)).values(**data).execution_options(synchronize_session=False)
+        )
+        return BulkMutationResult(matched=result.rowcount, dry_run=False, tasks_updated=result.rowcount)
+
+    matched = _stage_matches(db, filters)
+    if not matched:
+        # Nothing to relabel; do not create labels as a side effect
+        _drop_stage(db)
+        return BulkMutationResult(matched=0, dry_run=False)
+
+    new_labels = _get_or_create_labels(db, labels)
+    db.flush()
+    label_ids = [l.id for l in new_labels]
+
+    staged = select(_bulk_ids.c.id)
+    unlinked = db.execute(delete(TaskLabel).where(TaskLabel.c.task_id.in_(staged))).rowcount
+    linked = 0
+    if label_ids:
+        linked = db.execute(
+            insert(TaskLabel).from_select(
+                ["task_id", "label_id"],
+                select(_bulk_ids.c.id, Label.id).join(Label, Label.id.in_(label_ids)),
+            )
+        ).rowcount
+    # Label-only changes still count as a modification of the task
+    data.setdefault("updated_at", datetime.utcnow())
+    updated = db.execute(
+        update(Task).where(Task.id.in_(staged)).values(**data).execution_options(synchronize_session=False)
+    ).rowcount
+    _drop_stage(db)
+
+    return BulkMutationResult(
+        matched=matched,
+        dry_run=False,
+        tasks_updated=updated,
+        label_links_deleted=unlinked,
+        label_links_created=linked,
+    )
+
+
+@router.post("/bulk/delete", response_model=BulkMutationResult)
+def bulk_delete_tasks(payload: BulkDeleteRequest, db: Session = Depends(get_db)):
+    filters = _bulk_filters(payload.filter, payload.ids)
+    if payload.dry_run:
+        return BulkMutationResult(matched=_count_matches(db, filters), dry_run=True)
+
+    matched = _stage_matches(db, filters)
+    staged = select(_bulk_ids.c.id)
+    # Remove dependents explicitly: SQLite does not enforce ON DELETE CASCADE by default
+    edges = db.execute(
+        delete(TaskDependency).where(
+            or_(TaskDependency.src_task_id.in_(staged), TaskDependency.dst_task_id.in_(staged))
+        )
+    ).rowcount
+    unlinked = db.execute(delete(TaskLabel).where(TaskLabel.c.task_id.in_(staged))).rowcount
+    deleted = db.execute(
+        delete(Task).where(Task.id.in_(staged)).execution_options(synchronize_session=False)
+    ).rowcount
+    _drop_stage(db)
+
+    return BulkMutationResult(
+        matched=matched,
+        dry_run=False,
+        tasks_deleted=deleted,
+        edges_deleted=edges,
+        label_links_deleted=unlinked,
+    )
+
+
 @router.get("/{task_id}", response_model=TaskOut)
 def get_task(task_id: str, db: Session = Depends(get_db)):
     task = db.get(Task, task_id)
@@ -206,11 +457,8 @@ def ingest_tasks(payload: BatchCreateRequest, db: Session = Depends(get_db)):
     return create_tasks_batch(payload, db)
 
 
-@router.get("/integrations/graph", response_model=GraphResponse)
-def graph(db: Session = Depends(get_db)):
+def _build_graph(db: Session) -> GraphResponse:
     tasks = db.scalars(select(Task)).all()
-    from ..models import TaskDependency
-
     edges = db.scalars(select(TaskDependency)).all()
 
     nodes = [
@@ -220,4 +468,10 @@ def graph(db: Session = Depends(get_db)):
         GraphEdge(src_task_id=e.src_task_id, dst_task_id=e.dst_task_id, relation_type=e.relation_type)
         for e in edges
     ]
-    return GraphResponse(nodes=nodes, edges=graph_edges)
\ No newline at end of file
+    return GraphResponse(nodes=nodes, edges=graph_edges)
+
+
+@router.get("/integrations/graph", response_model=GraphResponse)
+def graph(db: Session = Depends(get_db)):
+    # Concurrent exports share one computation; callers that arrive later get the next one
+    return _graph_flight.do("graph", lambda: _build_graph(db))
\ No newline at end of file
@@ -78,7 +78,7 @@ class TaskOut(BaseModel):
         from_attributes = True
 
 
-class TaskQueryParams(BaseModel):
+class TaskFilter(BaseModel):
     q: Optional[str] = None
     status: Optional[StatusEnum] = None
     priority: Optional[PriorityEnum] = None
@@ -89,6 +89,9 @@ class TaskQueryParams(BaseModel):
     created_by_user_id: Optional[str] = None
     due_before: Optional[datetime] = None
     due_after: Optional[datetime] = None
+
+
+class TaskQueryParams(TaskFilter):
     sort_by: Optional[Literal[
         "created_at",
         "due_at",
@@ -105,6 +108,44 @@ class BatchCreateRequest(BaseModel):
     tasks: list[TaskCreate]
 
 
+class BulkSelector(BaseModel):
+    filter: TaskFilter = Field(default_factory=TaskFilter)
+    ids: Optional[list[str]] = Field(default=None, description="Explicit task ids, combined with filter")
+    dry_run: bool = False
+
+
+class BulkDeleteRequest(BulkSelector):
+    pass
+
+
+class BulkUpdateRequest(BulkSelector):
+    changes: TaskUpdate
+
+
+class BulkMutationResult(BaseModel):
+    matched: int
+    dry_run: bool
+    tasks_updated: int = 0
+    tasks_deleted: int = 0
+    edges_deleted: int = 0
+    label_links_deleted: int = 0
+    label_links_created: int = 0
+
+
+class TimelineBucket(BaseModel):
+    start: datetime
+    count: int
+    task_ids: list[str] = Field(default_factory=list)
+
+
+class TimelineResponse(BaseModel):
+    granularity: Literal["day", "week", "month"]
+    start: datetime
+    end: datetime
+    total: int
+    buckets: list[TimelineBucket]
+
+
 class GraphNode(BaseModel):
     id: str
     title: str
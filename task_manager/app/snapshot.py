@@ -0,0 +1,358 @@
+"""Binary snapshot export / bulk restore.
+
+Snapshot layout (the whole stream is gzip-compressed):
+
+    MAGIC
+    for each table:
+        b"T" <name> <ncols:u16> (<col name> <kind:u8>)*
+        (<nrows:u32> (<payload len:u32> <column payload>)*)*   # one block per chunk
+        <0:u32>                                                 # end of table
+    b"E"
+
+Column payloads are columnar: string columns are an int32 length array
+(-1 for NULL) followed by the concatenated UTF-8 bytes; timestamp columns are
+an int64 array of microseconds since the Unix epoch (UTC).
+
+Usage:
+    python -m app.snapshot export backup.snap
+    python -m app.snapshot import backup.snap [--replace]
+"""
+
+from __future__ import annotations
+
+import argparse
+import enum
+import gzip
+import struct
+import sys
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Iterable, Iterator
+
+from sqlalchemy import DateTime, Table, delete, literal, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+from .models import Base, Label, Task, TaskDependency, TaskLabel
+
+MAGIC = b"TMSNAP\x00\x01"
+CHUNK_ROWS = 10_000
+
+KIND_STR = 1
+KIND_TS = 2
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_TS_NULL = -(2**63)
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+
+# Restore order respects foreign keys; delete order is the reverse.
+SNAPSHOT_TABLES: list[Table] = [
+    Label.__table__,
+    Task.__table__,
+    TaskLabel,
+    TaskDependency.__table__,
+]
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def _column_kind(column) -> int:
+    return KIND_TS if isinstance(column.type, DateTime) else KIND_STR
+
+
+def _native_array(typecode: str, data: bytes | None = None) -> array:
+    arr = array(typecode)
+    if data is not None:
+        arr.frombytes(data)
+        if sys.byteorder != "little":
+            arr.byteswap()
+    return arr
+
+
+def _array_bytes(arr: array) -> bytes:
+    if sys.byteorder != "little":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _encode_str_column(values: Iterable) -> bytes:
+    lengths = _native_array("i")
+    parts: list[bytes] = []
+    for value in values:
+        if value is None:
+            lengths.append(-1)
+            continue
+        if isinstance(value, enum.Enum):
+            # SQLAlchemy Enum columns persist member names
+            value = value.name
+        raw = str(value).encode("utf-8")
+        lengths.append(len(raw))
+        parts.append(raw)
+    return _array_bytes(lengths) + b"".join(parts)
+
+
+def _decode_str_column(payload: bytes, nrows: int) -> list[str | None]:
+    header = nrows * 4
+    lengths = _native_array("i", payload[:header])
+    values: list[str | None] = []
+    pos = header
+    for length in lengths:
+        if length < 0:
+            values.append(None)
+        else:
+            values.append(payload[pos:pos + length].decode("utf-8"))
+            pos += length
+    return values
+
+
+def _encode_ts_column(values: Iterable) -> bytes:
+    micros = _native_array("q")
+    one_us = timedelta(microseconds=1)
+    for value in values:
+        if value is None:
+            micros.append(_TS_NULL)
+            continue
+        if value.tzinfo is None:
+            # SQLite drops tzinfo; stored values are UTC
+            value = value.replace(tzinfo=timezone.utc)
+        micros.append((value - _EPOCH) // one_us)
+    return _array_bytes(micros)
+
+
+def _decode_ts_column(payload: bytes, nrows: int) -> list[datetime | None]:
+    micros = _native_array("q", payload)
+    if len(micros) != nrows:
+        raise SnapshotError("Corrupt timestamp column")
+    return [None if v == _TS_NULL else _EPOCH + timedelta(microseconds=v) for v in micros]
+
+
+def _write_str(fp: BinaryIO, value: str) -> None:
+    raw = value.encode("utf-8")
+    fp.write(_U16.pack(len(raw)))
+    fp.write(raw)
+
+
+def _read_exact(fp: BinaryIO, size: int) -> bytes:
+    data = fp.read(size)
+    if len(data) != size:
+        raise SnapshotError("Unexpected end of snapshot")
+    return data
+
+
+def _read_str(fp: BinaryIO) -> str:
+    (size,) = _U16.unpack(_read_exact(fp, _U16.size))
+    return _read_exact(fp, size).decode("utf-8")
+
+
+def _export_table(conn: Connection, table: Table, fp: BinaryIO, chunk_rows: int) -> int:
+    columns = list(table.columns)
+    kinds = [_column_kind(c) for c in columns]
+
+    fp.write(b"T")
+    _write_str(fp, table.name)
+    fp.write(_U16.pack(len(columns)))
+    for column, kind in zip(columns, kinds):
+        _write_str(fp, column.name)
+        fp.write(bytes([kind]))
+
+    total = 0
+    result = conn.execution_options(stream_results=True, yield_per=chunk_rows).execute(select(table))
+    for rows in result.partitions():
+        nrows = len(rows)
+        fp.write(_U32.pack(nrows))
+        for idx, kind in enumerate(kinds):
+            values = (row[idx] for row in rows)
+            payload = _encode_ts_column(values) if kind == KIND_TS else _encode_str_column(values)
+            fp.write(_U32.pack(len(payload)))
+            fp.write(payload)
+        total += nrows
+    fp.write(_U32.pack(0))
+    return total
+
+
+def export_snapshot(engine: Engine, fp: BinaryIO, chunk_rows: int = CHUNK_ROWS, compresslevel: int = 6) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    with gzip.GzipFile(fileobj=fp, mode="wb", compresslevel=compresslevel) as out:
+        out.write(MAGIC)
+        with engine.connect() as conn:
+            # All tables must come from one snapshot or links may point at rows missing from the file.
+            # PostgreSQL's default READ COMMITTED snapshots per statement, and pysqlite sends no
+            # BEGIN before SELECTs, so ask for the snapshot explicitly.
+            if conn.dialect.name == "postgresql":
+                conn.execution_options(isolation_level="REPEATABLE READ")
+            with conn.begin():
+                if conn.dialect.name == "sqlite":
+                    conn.exec_driver_sql("BEGIN DEFERRED")
+                for table in SNAPSHOT_TABLES:
+                    counts[table.name] = _export_table(conn, table, out, chunk_rows)
+        out.write(b"E")
+    return counts
+
+
+def _iter_sections(fp: BinaryIO) -> Iterator[tuple[str, list[str], Iterator[list[tuple]]]]:
+    if _read_exact(fp, len(MAGIC)) != MAGIC:
+        raise SnapshotError("Not a task snapshot (bad magic)")
+    while True:
+        marker = _read_exact(fp, 1)
+        if marker == b"E":
+            return
+        if marker != b"T":
+            raise SnapshotError("Corrupt snapshot section marker")
+        name = _read_str(fp)
+        (ncols,) = _U16.unpack(_read_exact(fp, _U16.size))
+        names: list[str] = []
+        kinds: list[int] = []
+        for _ in range(ncols):
+            names.append(_read_str(fp))
+            kinds.append(_read_exact(fp, 1)[0])
+
+        def chunks(kinds: list[int] = kinds) -> Iterator[list[tuple]]:
+            while True:
+                (nrows,) = _U32.unpack(_read_exact(fp, _U32.size))
+                if nrows == 0:
+                    return
+                cols = []
+                for kind in kinds:
+                    (size,) = _U32.unpack(_read_exact(fp, _U32.size))
+                    payload = _read_exact(fp, size)
+                    if kind == KIND_TS:
+                        cols.append(_decode_ts_column(payload, nrows))
+                    else:
+                        cols.append(_decode_str_column(payload, nrows))
+                yield list(zip(*cols))
+
+        yield name, names, chunks()
+
+
+def _copy_rows(conn: Connection, table: Table, names: list[str], chunks: Iterator[list[tuple]]) -> int:
+    # PostgreSQL (psycopg 3): stream rows through COPY FROM STDIN
+    cols = ", ".join(f'"{n}"' for n in names)
+    total = 0
+    cursor = conn.connection.driver_connection.cursor()
+    try:
+        with cursor.copy(f'COPY "{table.name}" ({cols}) FROM STDIN') as copy:
+            for rows in chunks:
+                for row in rows:
+                    copy.write_row(row)
+                total += len(rows)
+    finally:
+        cursor.close()
+    return total
+
+
+def _insert_rows(conn: Connection, table: Table, names: list[str], chunks: Iterator[list[tuple]]) -> int:
+    total = 0
+    stmt = table.insert()
+    for rows in chunks:
+        conn.execute(stmt, [dict(zip(names, row)) for row in rows])
+        total += len(rows)
+    return total
+
+
+def _use_copy(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    cursor = conn.connection.driver_connection.cursor()
+    try:
+        return hasattr(cursor, "copy")
+    finally:
+        cursor.close()
+
+
+def import_snapshot(engine: Engine, fp: BinaryIO, replace: bool = False) -> dict[str, int]:
+    tables = {t.name: t for t in SNAPSHOT_TABLES}
+    counts: dict[str, int] = {}
+    Base.metadata.create_all(bind=engine)
+
+    with gzip.GzipFile(fileobj=fp, mode="rb") as src, engine.connect() as conn:
+        is_sqlite = conn.dialect.name == "sqlite"
+        prev_sync = None
+        if is_sqlite:
+            prev_sync = conn.exec_driver_sql("PRAGMA synchronous").scalar()
+            conn.exec_driver_sql("PRAGMA synchronous = OFF")
+            conn.commit()
+
+        dropped = [idx for table in SNAPSHOT_TABLES for idx in table.indexes]
+        try:
+            with conn.begin():
+                if replace:
+                    for table in reversed(SNAPSHOT_TABLES):
+                        conn.execute(delete(table))
+                else:
+                    for table in SNAPSHOT_TABLES:
+                        if conn.scalar(select(literal(1)).select_from(table).limit(1)):
+                            raise SnapshotError(
+                                f"Target table {table.name} is not empty; use --replace to overwrite"
+                            )
+
+                # Defer secondary index builds until all rows are loaded
+                for idx in dropped:
+                    idx.drop(conn, checkfirst=False)
+
+                use_copy = _use_copy(conn)
+                for name, names, chunks in _iter_sections(src):
+                    table = tables.get(name)
+                    if table is None:
+                        raise SnapshotError(f"Unknown table in snapshot: {name}")
+                    unknown = set(names) - set(table.columns.keys())
+                    if unknown:
+                        raise SnapshotError(f"Unknown columns for {name}: {sorted(unknown)}")
+                    loader = _copy_rows if use_copy else _insert_rows
+                    counts[name] = loader(conn, table, names, chunks)
+
+                for idx in dropped:
+                    try:
+                        idx.create(conn, checkfirst=False)
+                    except IntegrityError as exc:
+                        raise SnapshotError(f"Rebuilding index {idx.name} failed: {exc.orig}") from exc
+        except Exception:
+            # SQLite runs DDL outside the load transaction; put indexes back on failure
+            with conn.begin():
+                for idx in dropped:
+                    idx.create(conn, checkfirst=True)
+            raise
+        finally:
+            if is_sqlite and prev_sync is not None:
+                conn.exec_driver_sql(f"PRAGMA synchronous = {int(prev_sync)}")
+                conn.commit()
+    return counts
+
+
+def main(argv: list[str] | None = None) -> int:
+    from .db import engine
+
+    parser = argparse.ArgumentParser(prog="python -m app.snapshot", description="Export or restore a binary task snapshot")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_export = sub.add_parser("export", help="Write a snapshot of tasks, labels and relations")
+    p_export.add_argument("path")
+    p_export.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    p_export.add_argument("--compresslevel", type=int, default=6, choices=range(1, 10))
+
+    p_import = sub.add_parser("import", help="Bulk restore a snapshot into DATABASE_URL")
+    p_import.add_argument("path")
+    p_import.add_argument("--replace", action="store_true", help="Delete existing rows before restoring")
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "export":
+            with open(args.path, "wb") as fp:
+                counts = export_snapshot(engine, fp, chunk_rows=args.chunk_rows, compresslevel=args.compresslevel)
+        else:
+            with open(args.path, "rb") as fp:
+                counts = import_snapshot(engine, fp, replace=args.replace)
+    except SnapshotError as exc:
+        print(f"[snapshot] {exc}", file=sys.stderr)
+        return 1
+
+    for name, count in counts.items():
+        print(f"[snapshot] {args.command} {name}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
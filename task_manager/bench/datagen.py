@@ -0,0 +1,172 @@
+"""Seeded synthetic dataset generator for benchmarks.
+
+The same seed and parameters always produce the same rows (including ids), so
+results from different runs and databases are comparable.
+"""
+
+from __future__ import annotations
+
+import bisect
+import itertools
+import math
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+
+from app.models import Label, PriorityEnum, RelationTypeEnum, StatusEnum, Task, TaskDependency, TaskLabel
+
+WORDS = (
+    "api", "backend", "billing", "cache", "deploy", "design", "docs", "export", "frontend", "graph",
+    "import", "index", "invoice", "login", "metrics", "migration", "mobile", "onboarding", "payment",
+    "queue", "refactor", "release", "report", "search", "security", "signup", "sync", "timeline",
+    "upload", "webhook",
+)
+CHANNELS = ("work", "life", "study", "ops", "product")
+SUBCATEGORIES = ("feature", "bug", "chore", "research", "support")
+
+BASE_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass
+class DatasetSpec:
+    tasks: int = 100_000
+    labels: int = 200
+    users: int = 1_000
+    # Zipf exponent for label/assignee popularity; 0 is uniform
+    skew: float = 1.1
+    # Expected predecessor edges per task
+    edge_density: float = 1.5
+    # Predecessors are drawn from the previous `edge_window` tasks, which keeps the graph acyclic
+    edge_window: int = 1_000
+    max_labels_per_task: int = 3
+    seed: int = 42
+    chunk_rows: int = 10_000
+
+
+class _Zipf:
+    def __init__(self, n: int, s: float, rng: random.Random):
+        weights = [1.0 / (rank ** s) for rank in range(1, n + 1)]
+        self._cum = list(itertools.accumulate(weights))
+        self._rng = rng
+
+    def __call__(self) -> int:
+        return bisect.bisect_left(self._cum, self._rng.random() * self._cum[-1])
+
+
+def _poisson(rng: random.Random, lam: float) -> int:
+    if lam <= 0:
+        return 0
+    if lam > 30:
+        # Normal approximation; exp(-lam) underflows the product method for large lam
+        return max(int(round(rng.gauss(lam, math.sqrt(lam)))), 0)
+    # Knuth: multiply uniforms until the product drops below e^-lam
+    limit = math.exp(-lam)
+    k, p = 0, rng.random()
+    while p > limit:
+        k += 1
+        p *= rng.random()
+    return k
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def label_names(spec: DatasetSpec) -> list[str]:
+    return [f"label-{i:04d}" for i in range(spec.labels)]
+
+
+def user_ids(spec: DatasetSpec) -> list[str]:
+    return [f"user-{i:05d}" for i in range(spec.users)]
+
+
+def _flush(conn, table, rows: list[dict]) -> None:
+    if rows:
+        conn.execute(insert(table), rows)
+        rows.clear()
+
+
+def generate(engine: Engine, spec: DatasetSpec) -> dict[str, int]:
+    rng = random.Random(spec.seed)
+    pick_label = _Zipf(spec.labels, spec.skew, rng)
+    pick_user = _Zipf(spec.users, spec.skew, rng)
+    users = user_ids(spec)
+    statuses = (StatusEnum.todo, StatusEnum.in_progress, StatusEnum.done)
+    priorities = (PriorityEnum.red, PriorityEnum.yellow, PriorityEnum.green)
+
+    label_ids = [_uuid(rng) for _ in range(spec.labels)]
+    counts = {"labels": spec.labels, "tasks": 0, "task_labels": 0, "task_dependencies": 0}
+    task_ids: list[str] = []
+
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Label.__table__),
+            [{"id": lid, "name": name, "created_at": BASE_TIME} for lid, name in zip(label_ids, label_names(spec))],
+        )
+
+        task_rows: list[dict] = []
+        link_rows: list[dict] = []
+        edge_rows: list[dict] = []
+        for i in range(spec.tasks):
+            task_id = _uuid(rng)
+            task_ids.append(task_id)
+            created = BASE_TIME + timedelta(seconds=i * 30)
+            status = rng.choices(statuses, weights=(5, 2, 3))[0]
+            due = created + timedelta(days=rng.randint(-30, 120)) if rng.random() < 0.8 else None
+            words = rng.sample(WORDS, 3)
+            task_rows.append(
+                {
+                    "id": task_id,
+                    "title": " ".join(words),
+                    "description": f"{' '.join(rng.sample(WORDS, 8))} #{i}",
+                    "priority": rng.choices(priorities, weights=(1, 3, 2))[0],
+                    "status": status,
+                    "channel": rng.choice(CHANNELS),
+                    "subcategory": rng.choice(SUBCATEGORIES),
+                    "assigned_to_user_id": users[pick_user()] if rng.random() < 0.9 else None,
+                    "created_by_user_id": users[pick_user()],
+                    "start_at": created,
+                    "due_at": due,
+                    "completed_at": due if status == StatusEnum.done else None,
+                    "created_at": created,
+                    "updated_at": created,
+                }
+            )
+
+            chosen = {pick_label() for _ in range(rng.randint(0, spec.max_labels_per_task))}
+            link_rows.extend({"task_id": task_id, "label_id": label_ids[l]} for l in chosen)
+
+            # Poisson predecessor count; edges always point forward in task order
+            window = min(i, spec.edge_window)
+            if window:
+                n_edges = min(window, _poisson(rng, spec.edge_density))
+                for j in rng.sample(range(i - window, i), n_edges):
+                    edge_rows.append(
+                        {
+                            "id": _uuid(rng),
+                            "src_task_id": task_ids[j],
+                            "dst_task_id": task_id,
+                            "relation_type": RelationTypeEnum.precedes,
+                        }
+                    )
+
+            if len(task_rows) >= spec.chunk_rows:
+                counts["tasks"] += len(task_rows)
+                counts["task_labels"] += len(link_rows)
+                counts["task_dependencies"] += len(edge_rows)
+                _flush(conn, Task.__table__, task_rows)
+                _flush(conn, TaskLabel, link_rows)
+                _flush(conn, TaskDependency.__table__, edge_rows)
+
+        counts["tasks"] += len(task_rows)
+        counts["task_labels"] += len(link_rows)
+        counts["task_dependencies"] += len(edge_rows)
+        _flush(conn, Task.__table__, task_rows)
+        _flush(conn, TaskLabel, link_rows)
+        _flush(conn, TaskDependency.__table__, edge_rows)
+
+    return counts
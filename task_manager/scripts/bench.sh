@@ -0,0 +1,17 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+PROJECT_ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
+cd "$PROJECT_ROOT"
+
+if [ ! -d .venv ]; then
+  echo "[bench] venv not found, running setup..."
+  bash scripts/setup.sh
+fi
+
+# shellcheck disable=SC1091
+source .venv/bin/activate
+export PYTHONPATH="$PROJECT_ROOT"
+
+# Args are passed through, e.g. --tasks 1000000 --baseline bench/baseline.json
+exec python -m bench.run "$@"
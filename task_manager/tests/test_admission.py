@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.admission import LANES, Lane, Rejected, SingleFlight
+from app.main import app
+
+
+def test_lane_queues_then_sheds():
+    async def scenario():
+        lane = Lane("test", concurrency=1, queue_limit=1, queue_timeout=0.05, retry_after=3)
+        await lane.acquire()
+
+        waiter = asyncio.ensure_future(lane.acquire())
+        await asyncio.sleep(0)
+        assert lane.queued == 1
+
+        # Queue is full
+        with pytest.raises(Rejected) as full:
+            await lane.acquire()
+        assert full.value.status_code == 429
+        assert full.value.retry_after == 3
+
+        # Releasing hands the slot to the queued request
+        lane.release()
+        await waiter
+        assert lane.active == 1 and lane.queued == 0
+
+        # Waiting past the queue timeout is a 503
+        with pytest.raises(Rejected) as timeout:
+            await lane.acquire()
+        assert timeout.value.status_code == 503
+        assert timeout.value.retry_after == 3
+        lane.release()
+        assert lane.active == 0 and lane.queued == 0
+
+    asyncio.run(scenario())
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return {"nodes": []}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("graph", compute)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(flight.do("graph", compute))) for _ in range(4)]
+    for t in followers:
+        t.start()
+    for t in [leader, *followers]:
+        t.join()
+
+    assert len(calls) == 1
+    assert len(results) == 5 and all(r is results[0] for r in results)
+    # Once finished, the next call computes afresh
+    flight.do("graph", compute)
+    assert len(calls) == 2
+
+
+def test_full_lane_returns_retry_after():
+    lane = LANES["ingest"]
+    saved = lane.concurrency, lane.queue_limit
+    lane.concurrency, lane.queue_limit = 0, 0
+    try:
+        client = TestClient(app)
+        r = client.post("/api/v1/tasks/integrations/ingest", json={"tasks": []})
+        assert r.status_code == 429
+        assert r.headers["retry-after"] == str(lane.retry_after)
+        # Shed requests are still visible in metrics
+        assert 'admission_rejected_total{lane="ingest",reason="queue_full"}' in client.get("/metrics").text
+    finally:
+        lane.concurrency, lane.queue_limit = saved
+
+
+def test_retry_after_configuration(monkeypatch):
+    from app.admission import _lane_from_env
+
+    monkeypatch.setenv("ADMISSION_INGEST_RETRY_AFTER", "7")
+    lane = _lane_from_env("ingest", concurrency=2, queue_limit=8, queue_timeout=30.0, retry_after=5)
+    assert lane.retry_after == 7
+    # A 503 comes after waiting the whole queue timeout, so it never advertises less than that
+    assert lane.timeout_retry_after == 30
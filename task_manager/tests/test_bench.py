@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import os
+import tempfile
+
+from sqlalchemy import create_engine, select
+
+from app.models import Base, TaskDependency
+from bench.datagen import DatasetSpec, generate
+from bench.run import compare, run
+
+
+def _sqlite_url() -> str:
+    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+    tmp.close()
+    return f"sqlite:///{tmp.name}"
+
+
+def test_generator_is_deterministic_and_acyclic():
+    spec = DatasetSpec(tasks=3000, labels=20, users=30, edge_density=2.0, edge_window=50, chunk_rows=1000)
+    edge_sets = []
+    for _ in range(2):
+        url = _sqlite_url()
+        engine = create_engine(url, future=True)
+        Base.metadata.create_all(bind=engine)
+        counts = generate(engine, spec)
+        with engine.connect() as conn:
+            edge_sets.append(set(conn.execute(select(TaskDependency.src_task_id, TaskDependency.dst_task_id)).all()))
+        engine.dispose()
+        os.unlink(url[len("sqlite:///"):])
+
+    assert counts["tasks"] == 3000 and counts["task_dependencies"] == len(edge_sets[0]) > 0
+    assert edge_sets[0] == edge_sets[1]
+
+    # edge_density is the expected number of predecessors per task (task 0 has none)
+    assert abs(len(edge_sets[0]) / (spec.tasks - 1) - spec.edge_density) < 0.1
+
+    # Kahn's algorithm consumes every node only if the graph has no cycle
+    nodes = {n for edge in edge_sets[0] for n in edge}
+    indegree = {n: 0 for n in nodes}
+    for _, dst in edge_sets[0]:
+        indegree[dst] += 1
+    ready = [n for n, d in indegree.items() if d == 0]
+    seen = 0
+    while ready:
+        node = ready.pop()
+        seen += 1
+        for src, dst in edge_sets[0]:
+            if src == node:
+                indegree[dst] -= 1
+                if indegree[dst] == 0:
+                    ready.append(dst)
+    assert seen == len(nodes)
+
+
+def test_bench_smoke_and_compare():
+    url = _sqlite_url()
+    try:
+        results = run(url, DatasetSpec(tasks=200, labels=10, users=10), iterations=3, graph_iterations=1, ingest_batch=5)
+    finally:
+        os.unlink(url[len("sqlite:///"):])
+
+    assert set(results["scenarios"]) == {
+        "list_filters", "deep_pagination", "search", "graph_export", "batch_ingest", "relation_writes",
+    }
+    for r in results["scenarios"].values():
+        assert r["errors"] == 0
+        assert r["p50_ms"] <= r["p95_ms"] <= r["p99_ms"]
+
+    assert results["meta"]["concurrency"] == 1
+
+    slower = {"scenarios": {"search": {**results["scenarios"]["search"], "p95_ms": 0.001, "ops_per_sec": 1e9}}}
+    assert len(compare(results, slower, threshold=0.2)) == 2
+    assert compare(results, results, threshold=0.2) == []
+
+    # Failed or shed responses are regressions even when latency looks better
+    failing = {"scenarios": {"search": {**results["scenarios"]["search"], "errors": 3, "shed": 1}}}
+    assert len(compare(failing, results, threshold=0.2)) == 2
+
+
+def test_bench_concurrent_workers():
+    url = _sqlite_url()
+    try:
+        results = run(
+            url,
+            DatasetSpec(tasks=200, labels=10, users=10),
+            iterations=12,
+            graph_iterations=4,
+            ingest_batch=5,
+            only=["list_filters", "graph_export", "batch_ingest"],
+            concurrency=4,
+        )
+    finally:
+        os.unlink(url[len("sqlite:///"):])
+
+    assert results["meta"]["concurrency"] == 4
+    for r in results["scenarios"].values():
+        assert r["concurrency"] == 4
+        assert r["errors"] == 0
+        assert r["ops_per_sec"] > 0
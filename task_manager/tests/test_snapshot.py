@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import io
+import os
+import tempfile
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app.models import Base, Label, PriorityEnum, RelationTypeEnum, StatusEnum, Task, TaskDependency, TaskLabel
+from app.snapshot import SnapshotError, export_snapshot, import_snapshot
+
+
+def _make_engine():
+    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+    tmp.close()
+    engine = create_engine(f"sqlite:///{tmp.name}", connect_args={"check_same_thread": False}, future=True)
+    Base.metadata.create_all(bind=engine)
+    return engine, tmp.name
+
+
+def test_snapshot_roundtrip():
+    src, src_path = _make_engine()
+    dst, dst_path = _make_engine()
+    try:
+        with Session(src) as session:
+            backend = Label(name="backend")
+            a = Task(
+                title="A",
+                description="full description",
+                priority=PriorityEnum.red,
+                status=StatusEnum.in_progress,
+                channel="work",
+                due_at=datetime(2025, 1, 12, 9, 30),
+                labels=[backend],
+            )
+            b = Task(title="B", labels=[backend])
+            session.add_all([a, b])
+            session.flush()
+            session.add(TaskDependency(src_task_id=a.id, dst_task_id=b.id, relation_type=RelationTypeEnum.precedes))
+            session.commit()
+
+        buf = io.BytesIO()
+        counts = export_snapshot(src, buf, chunk_rows=1)
+        assert counts == {"labels": 1, "tasks": 2, "task_labels": 2, "task_dependencies": 1}
+
+        buf.seek(0)
+        assert import_snapshot(dst, buf) == counts
+
+        with Session(dst) as session:
+            restored = session.scalar(select(Task).where(Task.title == "A"))
+            assert restored.description == "full description"
+            assert restored.priority == PriorityEnum.red
+            assert restored.status == StatusEnum.in_progress
+            assert restored.due_at == datetime(2025, 1, 12, 9, 30)
+            assert restored.created_at is not None
+            assert [l.name for l in restored.labels] == ["backend"]
+            assert [e.relation_type for e in restored.outgoing_edges] == [RelationTypeEnum.precedes]
+            assert session.scalar(select(func.count()).select_from(TaskLabel)) == 2
+
+        # Restoring over existing data requires replace
+        buf.seek(0)
+        with pytest.raises(SnapshotError):
+            import_snapshot(dst, buf)
+        buf.seek(0)
+        assert import_snapshot(dst, buf, replace=True) == counts
+
+        # Any non-empty table blocks the restore, not only tasks
+        with Session(dst) as session:
+            session.query(Task).delete()
+            session.execute(TaskLabel.delete())
+            session.query(TaskDependency).delete()
+            session.commit()
+        buf.seek(0)
+        with pytest.raises(SnapshotError, match="labels"):
+            import_snapshot(dst, buf)
+    finally:
+        src.dispose()
+        dst.dispose()
+        os.unlink(src_path)
+        os.unlink(dst_path)
+
+
+def test_snapshot_export_is_consistent_across_tables(monkeypatch):
+    import app.snapshot as snapshot
+
+    src, src_path = _make_engine()
+    try:
+        with src.begin() as conn:
+            conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+        with Session(src) as session:
+            session.add(Task(title="A"))
+            session.commit()
+
+        export_table = snapshot._export_table
+
+        def export_then_write(conn, table, fp, chunk_rows):
+            total = export_table(conn, table, fp, chunk_rows)
+            if table.name == "labels":
+                # A concurrent writer links a new label after labels were already read
+                with Session(src) as session:
+                    task = session.scalar(select(Task))
+                    task.labels.append(Label(name="late"))
+                    session.commit()
+            return total
+
+        monkeypatch.setattr(snapshot, "_export_table", export_then_write)
+        counts = export_snapshot(src, io.BytesIO())
+        assert counts == {"labels": 0, "tasks": 1, "task_labels": 0, "task_dependencies": 0}
+    finally:
+        src.dispose()
+        os.unlink(src_path)
@@ -2,16 +2,18 @@ from __future__ import annotations
 
 import os
 import tempfile
+import time
 from typing import Generator
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, select
 from sqlalchemy.orm import sessionmaker
 
 from app.main import app
-from app.db import get_db
-from app.models import Base
+from app import metrics
+from app.db import TimedQueuePool, get_db, instrument_engine, pool_args
+from app.models import Base, Label
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -20,7 +22,9 @@ def _setup_test_db():
     tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
     tmp.close()
     os.environ["DATABASE_URL"] = f"sqlite:///{tmp.name}"
-    engine = create_engine(os.environ["DATABASE_URL"], connect_args={"check_same_thread": False}, future=True)
+    engine = instrument_engine(
+        create_engine(os.environ["DATABASE_URL"], connect_args={"check_same_thread": False}, future=True)
+    )
     TestingSessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
 
     Base.metadata.drop_all(bind=engine)
@@ -122,4 +126,175 @@ def test_relations(client: TestClient):
 
     # Ensure removed
     graph = client.get("/api/v1/tasks/integrations/graph").json()
-    assert not any(e for e in graph["edges"] if e["src_task_id"] == a["id"] and e["dst_task_id"] == b["id"])  # noqa
\ No newline at end of file
+    assert not any(e for e in graph["edges"] if e["src_task_id"] == a["id"] and e["dst_task_id"] == b["id"])  # noqa
+
+
+def test_bulk_update_and_delete(client: TestClient):
+    items = [
+        {"title": "Bulk 1", "labels": ["sprint-7"], "assigned_to_user_id": "gone"},
+        {"title": "Bulk 2", "labels": ["sprint-7"], "assigned_to_user_id": "gone"},
+        {"title": "Bulk 3", "labels": ["sprint-8"]},
+    ]
+    ids = [client.post("/api/v1/tasks", json=item).json()["id"] for item in items]
+
+    # Filter is required
+    r = client.post("/api/v1/tasks/bulk/update", json={"changes": {"status": "done"}})
+    assert r.status_code == 400
+
+    r = client.post(
+        "/api/v1/tasks/bulk/update",
+        json={"filter": {"label": "sprint-7"}, "changes": {"status": "done"}, "dry_run": True},
+    )
+    body = r.json()
+    assert body["matched"] == 2 and body["dry_run"] is True and body["tasks_updated"] == 0
+    assert client.get(f"/api/v1/tasks/{ids[0]}").json()["status"] == "todo"
+
+    # Filter on the label being replaced: every matched task must still be updated
+    r = client.post(
+        "/api/v1/tasks/bulk/update",
+        json={
+            "filter": {"label": "sprint-7"},
+            "changes": {"status": "done", "assigned_to_user_id": "u9", "labels": ["archived"]},
+        },
+    )
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["matched"] == 2 and body["tasks_updated"] == 2
+    assert body["label_links_deleted"] == 2 and body["label_links_created"] == 2
+    for task_id in ids[:2]:
+        task = client.get(f"/api/v1/tasks/{task_id}").json()
+        assert task["status"] == "done"
+        assert task["assigned_to_user_id"] == "u9"
+        assert [l["name"] for l in task["labels"]] == ["archived"]
+    assert client.get(f"/api/v1/tasks/{ids[2]}").json()["status"] == "todo"
+
+    r = client.post(f"/api/v1/relations/tasks/{ids[2]}/predecessors", json={"other_task_id": ids[0]})
+    assert r.status_code == 201
+
+    # No matches: labels must not be created as a side effect
+    r = client.post("/api/v1/tasks/bulk/update", json={"ids": [], "changes": {"labels": ["never-created"]}})
+    assert r.status_code == 200 and r.json()["matched"] == 0
+    session_gen = app.dependency_overrides[get_db]()
+    session = next(session_gen)
+    assert session.scalar(select(Label).where(Label.name == "never-created")) is None
+    session_gen.close()
+
+    r = client.post("/api/v1/tasks/bulk/delete", json={"filter": {"label": "archived"}, "ids": ids})
+    body = r.json()
+    assert body["tasks_deleted"] == 2 and body["edges_deleted"] == 1 and body["label_links_deleted"] == 2
+    assert client.get(f"/api/v1/tasks/{ids[0]}").status_code == 404
+    assert client.get(f"/api/v1/tasks/{ids[2]}").status_code == 200
+
+
+def test_timeline_buckets(client: TestClient):
+    items = [
+        {"title": "TL 1", "channel": "timeline", "due_at": "2031-03-02T09:00:00"},
+        {"title": "TL 2", "channel": "timeline", "due_at": "2031-03-02T17:00:00"},
+        {"title": "TL 3", "channel": "timeline", "due_at": "2031-03-05T10:00:00", "status": "done"},
+        {"title": "TL 4", "channel": "timeline", "due_at": "2031-04-01T10:00:00"},
+    ]
+    ids = [client.post("/api/v1/tasks", json=item).json()["id"] for item in items]
+    window = {"start": "2031-03-01T00:00:00", "end": "2031-05-01T00:00:00", "channel": "timeline"}
+
+    r = client.get("/api/v1/tasks/timeline", params={**window, "granularity": "day"})
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["total"] == 4
+    assert [b["count"] for b in data["buckets"]] == [2, 1, 1]
+    assert data["buckets"][0]["start"].startswith("2031-03-02")
+    assert data["buckets"][0]["task_ids"] == ids[:2]
+
+    # 2031-03-02 is a Sunday, so it falls in the week starting Monday 2031-02-24
+    r = client.get("/api/v1/tasks/timeline", params={**window, "granularity": "week", "per_bucket": 1})
+    weeks = r.json()["buckets"]
+    assert [b["start"][:10] for b in weeks] == ["2031-02-24", "2031-03-03", "2031-03-31"]
+    assert weeks[0]["count"] == 2 and weeks[0]["task_ids"] == ids[:1]
+
+    r = client.get(
+        "/api/v1/tasks/timeline",
+        params={**window, "granularity": "month", "counts_only": True, "open_only": True},
+    )
+    months = r.json()["buckets"]
+    assert [(b["start"][:7], b["count"], b["task_ids"]) for b in months] == [("2031-03", 2, []), ("2031-04", 1, [])]
+
+    # open_only is ANDed with an explicit status
+    r = client.get("/api/v1/tasks/timeline", params={**window, "open_only": True, "status": "done"})
+    assert r.json()["total"] == 0
+    r = client.get("/api/v1/tasks/timeline", params={**window, "open_only": True, "status": "todo"})
+    assert r.json()["total"] == 3
+
+    # One aware and one naive bound is valid; naive is treated as UTC
+    r = client.get(
+        "/api/v1/tasks/timeline",
+        params={**window, "start": "2031-03-01T00:00:00Z", "end": "2031-05-01T00:00:00", "counts_only": True},
+    )
+    assert r.status_code == 200, r.text
+    assert r.json()["total"] == 4
+    r = client.get(
+        "/api/v1/tasks/timeline",
+        params={**window, "start": "2031-03-02T10:00:00+02:00", "end": "2031-03-02T09:00:01", "counts_only": True},
+    )
+    assert r.json()["total"] == 1
+
+    r = client.get("/api/v1/tasks/timeline", params={"start": window["end"], "end": window["start"]})
+    assert r.status_code == 400
+
+
+def test_startup_adds_missing_indexes(monkeypatch):
+    import app.main as main_module
+
+    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
+    tmp.close()
+    engine = create_engine(f"sqlite:///{tmp.name}", future=True)
+    try:
+        # A database created before the timeline index existed
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP INDEX ix_tasks_status_due_at")
+
+        monkeypatch.setattr(main_module, "engine", engine)
+        main_module.on_startup()
+        main_module.on_startup()
+
+        names = {idx["name"] for idx in inspect(engine).get_indexes("tasks")}
+        assert "ix_tasks_status_due_at" in names
+    finally:
+        engine.dispose()
+        os.unlink(tmp.name)
+
+def test_metrics_endpoint(client: TestClient):
+    task = client.post("/api/v1/tasks", json={"title": "Metrics"}).json()
+    assert client.get(f"/api/v1/tasks/{task['id']}").status_code == 200
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    body = r.text
+    route = 'method="GET",route="/api/v1/tasks/{task_id}"'
+    assert f'http_requests_total{{{route},status="200"}}' in body
+    assert f'http_request_duration_seconds_bucket{{{route},le="+Inf"}}' in body
+    assert f"http_requests_in_flight{{{route}}} 0" in body
+    # SQL statements are attributed to the request that issued them
+    count_line = next(l for l in body.splitlines() if l.startswith(f"http_request_db_statements_sum{{{route}}}"))
+    assert float(count_line.split()[-1]) >= 1
+    assert "db_statement_duration_seconds_count" in body
+
+
+def test_pool_wait_excludes_connect_time(tmp_path):
+    for url in ("sqlite://", "sqlite:///:memory:", "sqlite+pysqlite:///:memory:"):
+        assert pool_args(url) == {}
+    assert pool_args(f"sqlite:///{tmp_path / 'x.db'}") == {"poolclass": TimedQueuePool}
+
+    engine = instrument_engine(create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=TimedQueuePool))
+
+    @event.listens_for(engine, "do_connect")
+    def _slow_connect(dialect, conn_rec, cargs, cparams):
+        time.sleep(0.2)
+
+    before = metrics.POOL_WAIT._series.get((), [None, 0.0, 0])[1:]
+    with engine.connect():
+        pass
+    total, count = metrics.POOL_WAIT._series[()][1:]
+    engine.dispose()
+    assert count == before[1] + 1
+    assert total - before[0] < 0.1